@@ -1,15 +1,19 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for, session
 from database.db_service import DatabaseService
+from database.scheduler import QueryCancelled, QueryRejected
 from config import Config
 import os
+import time
 from datetime import datetime
 from functools import wraps
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Initialize database service
+# Initialize database service (engines are created and connected on first use)
 db_service = DatabaseService()
+if app.config['DB_WARMUP_CONNECTIONS']:
+    db_service.warm_up(app.config['DB_WARMUP_CONNECTIONS'])
 
 # Login required decorator
 def login_required(f):
@@ -21,6 +25,30 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def can_bulk_triage():
+    """Whether the logged-in user may update more than a single record at once"""
+    roles = {role.strip().lower() for role in app.config['TRIAGE_BULK_ROLES'].split(',') if role.strip()}
+    return str(session.get('role') or '').strip().lower() in roles
+
+@app.context_processor
+def inject_permissions():
+    return {'can_bulk_triage': can_bulk_triage()}
+
+def page_block(page, pages):
+    """Align a multi-page fetch: first page of the block of `pages` pages containing `page`"""
+    pages = min(max(int(pages or 1), 1), app.config['MAX_FETCH_PAGES'])
+    page = max(page, 1)
+    return (page - 1) // pages * pages + 1, pages
+
+def query_context():
+    """Identify the caller for query scheduling (fair sharing and superseding)
+    and keep their reads on the primary for a while after they wrote"""
+    return {
+        'user_id': session.get('user_id'),
+        'client_id': request.headers.get('X-Client-Id'),
+        'primary': session.get('read_primary_until', 0) > time.time()
+    }
+
 @app.route('/login')
 def login():
     """Login page"""
@@ -82,6 +110,9 @@ def get_logs():
         # Get pagination parameters
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 25))
+
+        # Optional multi-page fetch (client-side pipelining)
+        page, pages = page_block(page, request.args.get('pages'))
         
         # Get search parameter
         search = request.args.get('search', '')
@@ -94,18 +125,24 @@ def get_logs():
             time_to=time_to,
             practice_id=practice_id,
             search=search,
-            page=page,
-            per_page=per_page
+            page=(page - 1) // pages + 1,
+            per_page=per_page * pages,
+            **query_context()
         )
         
         return jsonify({
             'data': logs,
             'total': total_count,
             'page': page,
+            'pages': pages,
             'per_page': per_page,
             'total_pages': (total_count + per_page - 1) // per_page
         })
         
+    except QueryCancelled as e:
+        return jsonify({'error': str(e), 'superseded': True}), 409
+    except QueryRejected as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         import traceback
         error_details = {
@@ -116,14 +153,50 @@ def get_logs():
         app.logger.error(f"Error in get_logs: {error_details}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/logs/triage', methods=['POST'])
+@login_required
+def bulk_triage():
+    """API endpoint to set Status / JiraStatus / LLMSolution on every matching log"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'message': 'Expected a JSON object body'}), 400
+
+        match = data.get('match')
+        if not isinstance(match, dict):
+            return jsonify({'success': False, 'message': '"match" must be an object'}), 400
+
+        # Anything beyond a single id can rewrite many rows
+        if set(key for key, value in match.items() if value not in (None, '')) - {'id'} and not can_bulk_triage():
+            return jsonify({'success': False, 'message': 'Your role may only update single records'}), 403
+
+        affected = db_service.bulk_triage(
+            match=data.get('match'),
+            changes=data.get('set'),
+            user_id=session.get('user_id')
+        )
+        # Replicas may lag behind this write; read from the primary until they catch up
+        session['read_primary_until'] = time.time() + app.config['REPLICA_MAX_LAG_SECONDS']
+        return jsonify({'success': True, 'affected': affected})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except QueryRejected as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
+    except Exception as e:
+        import traceback
+        app.logger.error(f"Error in bulk_triage: {traceback.format_exc()}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @app.route('/api/practice-ids')
 @login_required
 def get_practice_ids():
     """API endpoint to fetch distinct practice IDs"""
     try:
-        practice_ids = db_service.get_practice_ids()
+        practice_ids = db_service.get_practice_ids(user_id=session.get('user_id'))
         app.logger.info(f"Returning {len(practice_ids)} practice IDs to frontend")
         return jsonify(practice_ids)
+    except QueryRejected as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         import traceback
         app.logger.error(f"Error in get_practice_ids: {traceback.format_exc()}")
@@ -134,7 +207,11 @@ def test_connection():
     """Test endpoint to check database connectivity"""
     try:
         if db_service.test_connection():
-            return jsonify({'status': 'success', 'message': 'Database connection successful'})
+            return jsonify({
+                'status': 'success',
+                'message': 'Database connection successful',
+                'replicas': db_service.replica_status()
+            })
         else:
             return jsonify({'status': 'error', 'message': 'Database connection failed'}), 500
     except Exception as e:
@@ -142,6 +219,18 @@ def test_connection():
         app.logger.error(f"Error in test_connection: {traceback.format_exc()}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/health/live')
+def health_live():
+    """Liveness probe: the worker is up, no database round trip"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/api/health/ready')
+def health_ready():
+    """Readiness probe: the database is reachable (result cached briefly)"""
+    if db_service.is_ready():
+        return jsonify({'status': 'ready'})
+    return jsonify({'status': 'unavailable'}), 503
+
 @app.route('/api/logs-summary')
 @login_required
 def get_logs_summary():
@@ -156,21 +245,30 @@ def get_logs_summary():
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 25))
 
+        # Optional multi-page fetch (client-side pipelining)
+        page, pages = page_block(page, request.args.get('pages'))
+
         logs, total_count = db_service.get_console_error_logs_summary(
             date_from=date_from,
             date_to=date_to,
             practice_id=practice_id,
-            page=page,
-            per_page=per_page
+            page=(page - 1) // pages + 1,
+            per_page=per_page * pages,
+            **query_context()
         )
 
         return jsonify({
             'data': logs,
             'total': total_count,
             'page': page,
+            'pages': pages,
             'per_page': per_page,
             'total_pages': (total_count + per_page - 1) // per_page
         })
+    except QueryCancelled as e:
+        return jsonify({'error': str(e), 'superseded': True}), 409
+    except QueryRejected as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         import traceback
         app.logger.error(f"Error in get_logs_summary: {traceback.format_exc()}")
@@ -13,6 +13,35 @@ class Config:
     DB_USERNAME = os.environ.get('DB_USERNAME') or 'pms_nz'
     DB_PASSWORD = os.environ.get('DB_PASSWORD') or 'pms@@nz'
     DB_DRIVER = os.environ.get('DB_DRIVER') or 'ODBC Driver 17 for SQL Server'
+    DB_SSLMODE = os.environ.get('DB_SSLMODE') or 'require'
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT') or 10)
+
+    # Startup: connections opened in the background after boot (0 = connect on first use)
+    DB_WARMUP_CONNECTIONS = int(os.environ.get('DB_WARMUP_CONNECTIONS') or 0)
+    READINESS_CACHE_SECONDS = float(os.environ.get('READINESS_CACHE_SECONDS') or 5)
+
+    # Read replicas: comma separated Postgres URLs used for read-only queries
+    DATABASE_REPLICA_URLS = os.environ.get('DATABASE_REPLICA_URLS') or ''
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS') or 30)
+    REPLICA_CHECK_INTERVAL_SECONDS = float(os.environ.get('REPLICA_CHECK_INTERVAL_SECONDS') or 5)
+
+    # Query admission control (per worker process)
+    QUERY_LIMIT_TOTAL = int(os.environ.get('QUERY_LIMIT_TOTAL') or 10)
+    QUERY_LIMIT_INTERACTIVE = int(os.environ.get('QUERY_LIMIT_INTERACTIVE') or 8)
+    QUERY_LIMIT_SUMMARY = int(os.environ.get('QUERY_LIMIT_SUMMARY') or 2)
+    QUERY_LIMIT_TRIAGE = int(os.environ.get('QUERY_LIMIT_TRIAGE') or 1)
+    QUERY_TIMEOUT_INTERACTIVE_MS = int(os.environ.get('QUERY_TIMEOUT_INTERACTIVE_MS') or 10000)
+    QUERY_TIMEOUT_SUMMARY_MS = int(os.environ.get('QUERY_TIMEOUT_SUMMARY_MS') or 60000)
+    QUERY_TIMEOUT_TRIAGE_MS = int(os.environ.get('QUERY_TIMEOUT_TRIAGE_MS') or 30000)  # per batch
+    QUERY_MAX_WAIT_SECONDS = float(os.environ.get('QUERY_MAX_WAIT_SECONDS') or 30)
+
+    # Most pages a single /api/logs or /api/logs-summary request may return
+    MAX_FETCH_PAGES = int(os.environ.get('MAX_FETCH_PAGES') or 5)
+
+    # Bulk triage: rows updated and committed per statement
+    TRIAGE_BATCH_SIZE = int(os.environ.get('TRIAGE_BATCH_SIZE') or 5000)
+    # Roles (comma separated, case-insensitive) allowed to update more than a single record
+    TRIAGE_BULK_ROLES = os.environ.get('TRIAGE_BULK_ROLES') or 'admin'
 
     @property
     def DATABASE_URL(self):
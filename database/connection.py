@@ -1,5 +1,8 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+import itertools
 import os
+import threading
+import time
 from sqlalchemy.orm import sessionmaker
 from config import Config
 import logging
@@ -8,50 +11,240 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds the replica is behind the primary; 0 when it has replayed everything received.
+# NULL when the standby is not streaming from the primary: it has then replayed
+# all it received but is falling behind with no upper bound. Reading the WAL
+# receiver status needs pg_read_all_stats (e.g. GRANT pg_monitor) on the replica.
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+class ReplicaState:
+    """Engine and last known health of a single read replica"""
+
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.healthy = False
+        self.lag_seconds = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'healthy': self.healthy,
+            'lagSeconds': self.lag_seconds
+        }
+
 class DatabaseConnection:
-    """Database connection manager"""
+    """Database connection manager
+
+    Engines are created on first use and nothing connects until a query
+    runs, so importing the app never touches the network. After a fork
+    (e.g. gunicorn with --preload) the child drops the inherited pools and
+    opens its own connections.
+    """
     
     def __init__(self):
         self.config = Config()
-        self.engine = None
-        self.SessionLocal = None
-        self._initialize_connection()
+        self._engine = None
+        self._SessionLocal = None
+        self._replicas = []
+        self._replica_cycle = itertools.count()
+        self._replica_monitor = None
+        self._lock = threading.Lock()
+        self._warmup_size = 0
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    @property
+    def engine(self):
+        self._ensure_initialized()
+        return self._engine
+
+    @property
+    def SessionLocal(self):
+        self._ensure_initialized()
+        return self._SessionLocal
+
+    @property
+    def replicas(self):
+        self._ensure_initialized()
+        return self._replicas
+
+    def _ensure_initialized(self):
+        if self._engine is not None:
+            return
+        with self._lock:
+            if self._engine is None:
+                self._initialize_connection()
     
     def _initialize_connection(self):
-        """Initialize database connection"""
+        """Create the engines; connections are opened lazily by the pool"""
         try:
             # If DATABASE_URL is provided (e.g., Supabase Postgres), prefer it
             database_url = os.environ.get('DATABASE_URL') or self.config.DATABASE_URL
 
-            logger.info("Connecting using DATABASE_URL (preferred)")
+            logger.info("Creating engine for DATABASE_URL (preferred)")
 
-            self.engine = create_engine(
-                database_url,
-                echo=False,
-                pool_pre_ping=True,
-                pool_recycle=3600,
-                connect_args={
-                    "sslmode": "require"
-                }
-            )
-
-            # Test connection
-            with self.engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+            engine = self._create_engine(database_url)
 
-            logger.info("Database connection established successfully")
-
-            self.SessionLocal = sessionmaker(
+            self._SessionLocal = sessionmaker(
                 autocommit=False,
                 autoflush=False,
-                bind=self.engine
+                bind=engine
             )
+            self._initialize_replicas()
+            self._engine = engine
             return
 
         except Exception as e:
-            logger.error(f"Failed to connect to database: {str(e)}")
+            logger.error(f"Failed to create database engine: {str(e)}")
             raise
 
+    def _after_fork(self):
+        """Give the child process its own pools instead of the parent's sockets"""
+        self._lock = threading.Lock()
+        # Threads do not survive a fork; the monitor restarts on the next read
+        self._replica_monitor = None
+        if self._engine is not None:
+            # close=False leaves the parent's connections alone
+            self._engine.dispose(close=False)
+            for replica in self._replicas:
+                replica.engine.dispose(close=False)
+                replica.lock = threading.Lock()
+        if self._warmup_size:
+            self.warm_up(self._warmup_size)
+
+    def warm_up(self, size):
+        """Open up to `size` pooled connections in a background thread"""
+        self._warmup_size = size
+        thread = threading.Thread(target=self._warm_up, args=(size,), name='db-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self, size):
+        connections = []
+        try:
+            for _ in range(size):
+                connections.append(self.engine.connect())
+            logger.info(f"Warmed up {len(connections)} database connection(s)")
+        except Exception as e:
+            logger.warning(f"Database warm-up stopped after {len(connections)} connection(s): {str(e)}")
+        finally:
+            for conn in connections:
+                conn.close()
+
+    def _create_engine(self, database_url):
+        """Create an engine with the shared pool settings"""
+        return create_engine(
+            database_url,
+            echo=False,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            connect_args={
+                "sslmode": self.config.DB_SSLMODE,
+                "connect_timeout": self.config.DB_CONNECT_TIMEOUT
+            }
+        )
+
+    def _initialize_replicas(self):
+        """Create engines for the read replicas; a background thread checks them from first use"""
+        self._replicas = []
+        replica_urls = [url.strip() for url in self.config.DATABASE_REPLICA_URLS.split(',') if url.strip()]
+
+        for index, replica_url in enumerate(replica_urls, 1):
+            engine = self._create_engine(replica_url)
+            replica = ReplicaState(f"replica-{index}", engine)
+            self._watch_disconnects(replica)
+            self._replicas.append(replica)
+
+        if self._replicas:
+            logger.info(f"Configured {len(self._replicas)} read replica(s)")
+
+    def _watch_disconnects(self, replica):
+        """Take a replica out of rotation as soon as one of its connections drops"""
+        @event.listens_for(replica.engine, "handle_error")
+        def handle_error(context):
+            if context.is_disconnect and replica.healthy:
+                logger.warning(f"Read replica {replica.name} disconnected, routing reads to primary")
+                replica.healthy = False
+                replica.checked_at = time.monotonic()
+
+    def _check_replica(self, replica):
+        """Refresh health and lag of a replica if the last check is stale"""
+        interval = self.config.REPLICA_CHECK_INTERVAL_SECONDS
+        if time.monotonic() - replica.checked_at < interval:
+            return
+
+        # Only one thread checks; the others keep using the last known state
+        if not replica.lock.acquire(blocking=False):
+            return
+        try:
+            with replica.engine.connect() as conn:
+                lag = conn.execute(text(REPLICA_LAG_QUERY)).scalar()
+            if lag is None:
+                raise RuntimeError('WAL receiver is not streaming from the primary')
+            replica.lag_seconds = float(lag)
+            if not replica.healthy:
+                logger.info(f"Read replica {replica.name} is healthy (lag {replica.lag_seconds:.1f}s)")
+            replica.healthy = True
+        except Exception as e:
+            if replica.healthy or replica.checked_at == 0.0:
+                logger.warning(f"Read replica {replica.name} health check failed: {str(e)}")
+            replica.healthy = False
+            replica.lag_seconds = None
+        finally:
+            replica.checked_at = time.monotonic()
+            replica.lock.release()
+
+    def _start_replica_monitor(self):
+        """Start the background health checks once per process"""
+        if self._replica_monitor is not None and self._replica_monitor.is_alive():
+            return
+        with self._lock:
+            if self._replica_monitor is None or not self._replica_monitor.is_alive():
+                self._replica_monitor = threading.Thread(
+                    target=self._monitor_replicas, name='db-replica-monitor', daemon=True
+                )
+                self._replica_monitor.start()
+
+    def _monitor_replicas(self):
+        """Check every replica each REPLICA_CHECK_INTERVAL_SECONDS, off the request path"""
+        while True:
+            for replica in self._replicas:
+                self._check_replica(replica)
+            time.sleep(self.config.REPLICA_CHECK_INTERVAL_SECONDS)
+
+    def _pick_replica(self):
+        """Round-robin over healthy replicas whose lag is within the threshold.
+
+        Only reads the state kept by the monitor thread, so an unreachable
+        replica never delays a request. Replicas join the rotation after their
+        first successful check.
+        """
+        if not self.replicas:
+            return None
+
+        self._start_replica_monitor()
+
+        max_lag = self.config.REPLICA_MAX_LAG_SECONDS
+        candidates = [
+            replica for replica in self.replicas
+            if replica.healthy and replica.lag_seconds is not None and replica.lag_seconds <= max_lag
+        ]
+        if not candidates:
+            return None
+        return candidates[next(self._replica_cycle) % len(candidates)]
+
     def _get_connection_strings(self):
         """Get multiple connection string formats to try"""
         server = self.config.DB_SERVER
@@ -87,6 +280,21 @@ class DatabaseConnection:
     def get_session(self):
         """Get database session"""
         return self.SessionLocal()
+
+    def get_read_session(self, primary=False):
+        """Get a session for read-only queries, on a replica when one is usable.
+
+        primary=True reads from the primary, for callers that must see their own
+        recent writes.
+        """
+        replica = None if primary else self._pick_replica()
+        if replica is None:
+            return self.SessionLocal()
+        return replica.SessionLocal()
+
+    def replica_status(self):
+        """Last known health and lag of every configured replica"""
+        return [replica.to_dict() for replica in self.replicas]
     
     def test_connection(self):
         """Test database connection"""
@@ -1,8 +1,12 @@
 from sqlalchemy import text
 from database.connection import DatabaseConnection
 from database.models import ConsoleErrorLog
-from datetime import datetime
+from database.scheduler import QueryScheduler, QueryCancelled, QueryRejected
+from config import Config
+from datetime import date, datetime, time as dt_time
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -10,109 +14,129 @@ class DatabaseService:
     """Service layer for database operations"""
     
     def __init__(self):
+        self.config = Config()
         self.db_connection = DatabaseConnection()
+        self.scheduler = QueryScheduler.from_config(self.config)
+        self._ready = False
+        self._ready_checked_at = None
+        self._ready_lock = threading.Lock()
     
     def get_console_error_logs(self, date_from=None, date_to=None, time_from=None, 
                              time_to=None, practice_id=None, search=None, 
-                             page=1, per_page=25):
+                             page=1, per_page=25, user_id=None, client_id=None, primary=False):
         """
         Fetch console error logs using stored procedure with filtering and pagination
         """
         try:
-            session = self.db_connection.get_session()
+            with self.scheduler.slot('interactive', user_id=user_id,
+                                     client_id=client_id, channel='logs') as ticket:
+                session = self.db_connection.get_read_session(primary=primary)
+                ticket.bind(session)
             
-            # Prepare parameters for stored procedure
-            params = {
-                'DateFrom': date_from,
-                'DateTo': date_to,
-                'TimeFrom': time_from,
-                'TimeTo': time_to,
-                'PracticeID': practice_id
-            }
+                # Prepare parameters for stored procedure
+                params = {
+                    'DateFrom': date_from,
+                    'DateTo': date_to,
+                    'TimeFrom': time_from,
+                    'TimeTo': time_to,
+                    'PracticeID': practice_id
+                }
             
-            # Supabase/Postgres function call without schema prefix
-            sp_query = text("""
-                SELECT * FROM sp_getconsoleerrorlogs(
-                    :DateFrom,
-                    :DateTo,
-                    :TimeFrom,
-                    :TimeTo,
-                    :PracticeID,
-                    :Page,
-                    :PerPage
-                )
-            """)
+                # Supabase/Postgres function call without schema prefix
+                sp_query = text("""
+                    SELECT * FROM sp_getconsoleerrorlogs(
+                        :DateFrom,
+                        :DateTo,
+                        :TimeFrom,
+                        :TimeTo,
+                        :PracticeID,
+                        :Page,
+                        :PerPage
+                    )
+                """)
 
-            # Include pagination params
-            params_with_pagination = {
-                **params,
-                'Page': page,
-                'PerPage': per_page
-            }
+                # Include pagination params
+                params_with_pagination = {
+                    **params,
+                    'Page': page,
+                    'PerPage': per_page
+                }
 
-            result = session.execute(sp_query, params_with_pagination)
-            rows = result.fetchall()
+                result = session.execute(sp_query, params_with_pagination)
+                rows = result.fetchall()
             
-            # Convert to list of dictionaries
-            logs = []
-            for row in rows:
-                log_dict = {
-                    'id': row[0],
-                    'practiceid': row[1],
-                    'stacktraces': row[2],
-                    'ErrorMassage': row[3],
-                    'url': row[4],
-                    'ErrorTime': self._format_time_string(row[5]),  # Keep as string for time values
-                    'insertdat': self._format_datetime(row[6]),
-                    'updatedat': self._format_datetime(row[7]),
-                    'JiraStatus': row[8],
-                    'Status': row[9],
-                    'LLMSolution': row[10] if len(row) > 10 else None
-                }
-                logs.append(log_dict)
+                # Convert to list of dictionaries
+                logs = []
+                for row in rows:
+                    log_dict = {
+                        'id': row[0],
+                        'practiceid': row[1],
+                        'stacktraces': row[2],
+                        'ErrorMassage': row[3],
+                        'url': row[4],
+                        'ErrorTime': self._format_time_string(row[5]),  # Keep as string for time values
+                        'insertdat': self._format_datetime(row[6]),
+                        'updatedat': self._format_datetime(row[7]),
+                        'JiraStatus': row[8],
+                        'Status': row[9],
+                        'LLMSolution': row[10] if len(row) > 10 else None
+                    }
+                    logs.append(log_dict)
             
-            # Read TotalCount from the last column if rows returned, else 0
-            total_count = int(rows[0][-1]) if rows else 0
+                # Read TotalCount from the last column if rows returned, else 0
+                total_count = int(rows[0][-1]) if rows else 0
             
-            # Apply search filter client-side if provided (affects count on this page only)
-            if search:
-                search_lower = search.lower()
-                logs = [log for log in logs if any(
-                    search_lower in str(value).lower() 
-                    for value in log.values() 
-                    if value is not None
-                )]
-                # When client-side searching is applied here, reflect the filtered count for this page
-                total_count = len(logs)
+                # Apply search filter client-side if provided (affects count on this page only)
+                if search:
+                    search_lower = search.lower()
+                    logs = [log for log in logs if any(
+                        search_lower in str(value).lower() 
+                        for value in log.values() 
+                        if value is not None
+                    )]
+                    # When client-side searching is applied here, reflect the filtered count for this page
+                    total_count = len(logs)
             
-            session.close()
-            return logs, total_count
+                ticket.release_connection(session)
+                return logs, total_count
             
+        except (QueryCancelled, QueryRejected) as e:
+            logger.info(f"Query not run: {str(e)}")
+            if 'session' in locals():
+                session.close()
+            raise
         except Exception as e:
             logger.error(f"Error fetching console error logs: {str(e)}")
             if 'session' in locals():
                 session.close()
             raise
     
-    def get_practice_ids(self):
+    def get_practice_ids(self, user_id=None):
         """
         Fetch distinct practice IDs using stored procedure
         """
         try:
-            session = self.db_connection.get_session()
+            with self.scheduler.slot('interactive', user_id=user_id) as ticket:
+                session = self.db_connection.get_read_session()
+                ticket.bind(session)
 
-            # Query table directly for distinct practice IDs (Supabase tables without schema)
-            result = session.execute(text(
-                "SELECT DISTINCT practiceid FROM tblconsoleerrorlogs WHERE practiceid IS NOT NULL ORDER BY practiceid"
-            ))
-            rows = result.fetchall()
+                # Query table directly for distinct practice IDs (Supabase tables without schema)
+                result = session.execute(text(
+                    "SELECT DISTINCT practiceid FROM tblconsoleerrorlogs WHERE practiceid IS NOT NULL ORDER BY practiceid"
+                ))
+                rows = result.fetchall()
 
-            practice_ids = [{'id': row[0]} for row in rows if row[0] is not None]
+                practice_ids = [{'id': row[0]} for row in rows if row[0] is not None]
 
-            logger.info(f"Loaded {len(practice_ids)} unique practice IDs")
-            session.close()
-            return practice_ids
+                logger.info(f"Loaded {len(practice_ids)} unique practice IDs")
+                ticket.release_connection(session)
+                return practice_ids
 
+        except (QueryCancelled, QueryRejected) as e:
+            logger.info(f"Query not run: {str(e)}")
+            if 'session' in locals():
+                session.close()
+            raise
         except Exception as e:
             logger.error(f"Error fetching practice IDs: {str(e)}")
             if 'session' in locals():
@@ -123,6 +147,197 @@ class DatabaseService:
         """Test database connection"""
         return self.db_connection.test_connection()
 
+    def is_ready(self):
+        """
+        Readiness for the health endpoint, re-checked at most every READINESS_CACHE_SECONDS
+        """
+        checked_at = self._ready_checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.config.READINESS_CACHE_SECONDS:
+            return self._ready
+
+        # Concurrent probes reuse the last result instead of piling onto the database
+        if not self._ready_lock.acquire(blocking=False):
+            return self._ready
+        try:
+            self._ready = self.db_connection.test_connection()
+            self._ready_checked_at = time.monotonic()
+            return self._ready
+        finally:
+            self._ready_lock.release()
+
+    def warm_up(self, size):
+        """Open pooled connections in the background so the first requests don't pay for them"""
+        return self.db_connection.warm_up(size)
+
+    def replica_status(self):
+        """Health and lag of the configured read replicas"""
+        return self.db_connection.replica_status()
+
+    def bulk_triage(self, match, changes, user_id=None):
+        """
+        Set Status / JiraStatus / LLMSolution on every row matching `match`.
+
+        `match` may hold an `id`, a `like_id` (every row with the same
+        fingerprint as that row), a `fingerprint` ("<stacktrace hash>:<message hash>"
+        in hex) and the usual filters (date_from, date_to, time_from, time_to,
+        practice_id); all given criteria must hold. Rows are updated in id order,
+        TRIAGE_BATCH_SIZE per statement, committing after each batch so row locks
+        stay short. Returns the number of rows changed.
+        """
+        assignments = self._triage_assignments(changes)
+
+        try:
+            with self.scheduler.slot('triage', user_id=user_id) as ticket:
+                session = self.db_connection.get_session()
+                conditions, params = self._triage_conditions(session, match)
+
+                set_clause = ', '.join(f"{column} = :set_{column}" for column in assignments)
+                changed_clause = ' OR '.join(f"l.{column} IS DISTINCT FROM :set_{column}" for column in assignments)
+                params.update({f"set_{column}": value for column, value in assignments.items()})
+
+                batch_query = text(f"""
+                    WITH batch AS (
+                        SELECT l.id
+                        FROM tblconsoleerrorlogs l
+                        WHERE l.id > :after_id AND {' AND '.join(conditions)}
+                        ORDER BY l.id
+                        LIMIT :batch_size
+                    ), updated AS (
+                        UPDATE tblconsoleerrorlogs l
+                        SET {set_clause}, updatedat = LOCALTIMESTAMP
+                        FROM batch b
+                        WHERE l.id = b.id AND ({changed_clause})
+                        RETURNING l.id
+                    )
+                    SELECT (SELECT MAX(id) FROM batch), (SELECT COUNT(1) FROM updated)
+                """)
+
+                after_id = 0
+                affected = 0
+                while True:
+                    ticket.bind(session)
+                    last_id, count = session.execute(batch_query, {
+                        **params,
+                        'after_id': after_id,
+                        'batch_size': self.config.TRIAGE_BATCH_SIZE
+                    }).fetchone()
+                    session.commit()
+
+                    if last_id is None:
+                        break
+                    affected += count
+                    after_id = last_id
+
+                logger.info(f"Bulk triage updated {affected} rows ({', '.join(assignments)})")
+                ticket.release_connection(session)
+                return affected
+
+        except (QueryCancelled, QueryRejected, ValueError) as e:
+            logger.info(f"Bulk triage not run: {str(e)}")
+            if 'session' in locals():
+                session.close()
+            raise
+        except Exception as e:
+            logger.error(f"Error in bulk triage: {str(e)}")
+            if 'session' in locals():
+                session.rollback()
+                session.close()
+            raise
+
+    def _triage_assignments(self, changes):
+        """Map API field names to columns, rejecting anything else"""
+        columns = {'Status': 'status', 'JiraStatus': 'jirastatus', 'LLMSolution': 'llmsolution'}
+
+        if changes is not None and not isinstance(changes, dict):
+            raise ValueError('"set" must be an object')
+        unknown = set(changes or {}) - set(columns)
+        if unknown:
+            raise ValueError(f"Cannot update field(s): {', '.join(sorted(unknown))}")
+        if not changes:
+            raise ValueError('Nothing to update')
+
+        for field, value in changes.items():
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"{field} must be a string")
+
+        return {columns[field]: value for field, value in changes.items()}
+
+    def _triage_conditions(self, session, match):
+        """Build the WHERE conditions (on bare indexed columns) for a triage match"""
+        match = match or {}
+        if not isinstance(match, dict):
+            raise ValueError('"match" must be an object')
+        conditions = []
+        params = {}
+
+        if match.get('id') is not None:
+            conditions.append('l.id = :id')
+            params['id'] = self._triage_int(match, 'id')
+
+        fingerprint = None
+        if match.get('like_id') is not None:
+            row = session.execute(
+                text("SELECT stacktrace_hash, message_hash FROM tblconsoleerrorlogs WHERE id = :id"),
+                {'id': self._triage_int(match, 'like_id')}
+            ).fetchone()
+            if row is None:
+                raise ValueError('Record not found')
+            fingerprint = (row[0], row[1])
+        elif match.get('fingerprint'):
+            if not isinstance(match['fingerprint'], str):
+                raise ValueError('Fingerprint must be "<stacktrace hash>:<message hash>" in hex')
+            try:
+                stacktrace_hex, message_hex = match['fingerprint'].split(':')
+                fingerprint = (bytes.fromhex(stacktrace_hex) or None, bytes.fromhex(message_hex) or None)
+            except ValueError:
+                raise ValueError('Fingerprint must be "<stacktrace hash>:<message hash>" in hex')
+
+        if fingerprint is not None:
+            if fingerprint == (None, None):
+                raise ValueError('Record has no fingerprint yet; run migrate_content_blobs.py')
+            for column, value in zip(('stacktrace_hash', 'message_hash'), fingerprint):
+                if value is None:
+                    conditions.append(f"l.{column} IS NULL")
+                else:
+                    conditions.append(f"l.{column} = :{column}")
+                    params[column] = value
+
+        # (name, condition, parser used to reject malformed values before they reach the database)
+        filters = [
+            ('date_from', 'l.insertdat >= CAST(:date_from AS DATE)', date.fromisoformat),
+            ('date_to', 'l.insertdat < CAST(:date_to AS DATE) + 1', date.fromisoformat),
+            ('time_from', 'l.errortime_of_day >= CAST(:time_from AS TIME)', dt_time.fromisoformat),
+            ('time_to', 'l.errortime_of_day <= CAST(:time_to AS TIME)', dt_time.fromisoformat),
+        ]
+        for name, condition, parse in filters:
+            value = match.get(name)
+            if value is not None and str(value).strip():
+                try:
+                    parse(str(value).strip())
+                except ValueError:
+                    raise ValueError(f"Invalid {name}: {value}")
+                conditions.append(condition)
+                params[name] = str(value).strip()
+
+        if match.get('practice_id') is not None and str(match['practice_id']).strip():
+            conditions.append('l.practiceid = :practice_id')
+            params['practice_id'] = self._triage_int(match, 'practice_id')
+
+        if not conditions:
+            raise ValueError('Refusing to update every row: give an id, fingerprint or filter')
+
+        return conditions, params
+
+    def _triage_int(self, match, name):
+        """Integer value of a match field, as a ValueError (400) when malformed"""
+        value = match[name]
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"{name} must be an integer")
+        try:
+            return int(str(value).strip())
+        except ValueError:
+            raise ValueError(f"{name} must be an integer")
+
     def authenticate_user(self, username, password):
         """
         Authenticate user using stored procedure
@@ -168,50 +383,60 @@ class DatabaseService:
                 'message': 'Authentication failed. Please try again.'
             }
 
-    def get_console_error_logs_summary(self, date_from=None, date_to=None, practice_id=None, page=1, per_page=25):
+    def get_console_error_logs_summary(self, date_from=None, date_to=None, practice_id=None, page=1, per_page=25,
+                                       user_id=None, client_id=None, primary=False):
         """
         Fetch aggregated/summary console error logs using stored procedure with pagination
         """
         try:
-            session = self.db_connection.get_session()
+            with self.scheduler.slot('summary', user_id=user_id,
+                                     client_id=client_id, channel='logs-summary') as ticket:
+                session = self.db_connection.get_read_session(primary=primary)
+                ticket.bind(session)
 
-            params = {
-                'DateFrom': date_from,
-                'DateTo': date_to,
-                'PracticeID': practice_id,
-                'Page': page,
-                'PerPage': per_page
-            }
+                params = {
+                    'DateFrom': date_from,
+                    'DateTo': date_to,
+                    'PracticeID': practice_id,
+                    'Page': page,
+                    'PerPage': per_page
+                }
 
-            sp_query = text("""
-                SELECT * FROM sp_getconsoleerrorlogssummary(
-                    :DateFrom,
-                    :DateTo,
-                    :PracticeID,
-                    :Page,
-                    :PerPage
-                )
-            """)
+                sp_query = text("""
+                    SELECT * FROM sp_getconsoleerrorlogssummary(
+                        :DateFrom,
+                        :DateTo,
+                        :PracticeID,
+                        :Page,
+                        :PerPage
+                    )
+                """)
 
-            result = session.execute(sp_query, params)
-            rows = result.fetchall()
-
-            logs = []
-            for row in rows:
-                log_dict = {
-                    'practiceids': row[0],
-                    'stacktraces': row[1],
-                    'ErrorMassage': row[2],
-                    'LLMSolution': row[3],
-                    'ErrorCount': row[4]
-                }
-                logs.append(log_dict)
+                result = session.execute(sp_query, params)
+                rows = result.fetchall()
 
-            total_count = int(rows[0][-1]) if rows else 0
+                logs = []
+                for row in rows:
+                    log_dict = {
+                        'practiceids': row[0],
+                        'stacktraces': row[1],
+                        'ErrorMassage': row[2],
+                        'LLMSolution': row[3],
+                        'ErrorCount': row[4],
+                        'Fingerprint': row[5] if len(row) > 6 else None
+                    }
+                    logs.append(log_dict)
 
-            session.close()
-            return logs, total_count
+                total_count = int(rows[0][-1]) if rows else 0
 
+                ticket.release_connection(session)
+                return logs, total_count
+
+        except (QueryCancelled, QueryRejected) as e:
+            logger.info(f"Query not run: {str(e)}")
+            if 'session' in locals():
+                session.close()
+            raise
         except Exception as e:
             logger.error(f"Error fetching console error logs summary: {str(e)}")
             if 'session' in locals():
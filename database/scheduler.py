@@ -0,0 +1,230 @@
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCancelled(Exception):
+    """Raised when a query is superseded by a newer request from the same client"""
+
+
+class QueryRejected(Exception):
+    """Raised when a query waits too long for a free slot"""
+
+
+class _Ticket:
+    """A single admitted (or waiting) query"""
+
+    def __init__(self, query_class, priority, statement_timeout_ms, user_id, client_key, seq):
+        self.query_class = query_class
+        self.priority = priority
+        self.statement_timeout_ms = statement_timeout_ms
+        self.user_id = user_id
+        self.client_key = client_key
+        self.seq = seq
+        self.running = False
+        self.cancelled = False
+        self.dbapi_connection = None
+        # Serialises interrupt() with bind() and unbind(). This only protects
+        # the connection while the ticket holds it: callers must unbind before
+        # the session returns it to the pool (see release_connection)
+        self._lock = threading.Lock()
+
+    def bind(self, session):
+        """Apply the class statement timeout and remember the connection for cancellation"""
+        if session.get_bind().dialect.name != 'postgresql':
+            return
+
+        # set_config(..., true) is transaction-local, so the timeout never
+        # leaks to the next user of the pooled connection
+        session.execute(
+            text("SELECT set_config('statement_timeout', :timeout, true)"),
+            {'timeout': str(int(self.statement_timeout_ms))}
+        )
+        with self._lock:
+            self.dbapi_connection = session.connection().connection.dbapi_connection
+        if self.cancelled:
+            raise QueryCancelled('Query superseded by a newer request')
+
+    def cancel(self):
+        """Mark the query cancelled; a waiting query is dropped from the queue"""
+        self.cancelled = True
+
+    def interrupt(self):
+        """Cancel a running query on the server.
+
+        psycopg2 opens a new connection to send the cancel request, which can
+        take up to the connect timeout, so never call this while holding the
+        scheduler lock.
+        """
+        with self._lock:
+            connection = self.dbapi_connection
+            if self.running and connection is not None and hasattr(connection, 'cancel'):
+                try:
+                    connection.cancel()
+                except Exception as e:
+                    logger.warning(f"Failed to cancel superseded query: {str(e)}")
+
+    def unbind(self):
+        """Forget the connection once the query has finished"""
+        with self._lock:
+            self.running = False
+            self.dbapi_connection = None
+
+    def release_connection(self, session):
+        """Close the session inside the slot, unbinding first so a late cancel
+        cannot reach the connection once another query has checked it out"""
+        self.unbind()
+        session.close()
+
+
+class QueryScheduler:
+    """Admission control for database queries.
+
+    Every query belongs to a class (interactive, summary, triage) with its own
+    concurrency limit, priority and statement timeout. Waiting queries are
+    admitted by priority first, then by the number of queries their user
+    already has running (fair sharing), then in arrival order. A new query from
+    the same client and channel supersedes the previous one, which is dropped
+    from the queue or cancelled on the server if already running.
+    """
+
+    def __init__(self, limits, priorities, timeouts, total_limit, max_wait):
+        self.limits = dict(limits)
+        self.priorities = dict(priorities)
+        self.timeouts = dict(timeouts)
+        self.total_limit = total_limit
+        self.max_wait = max_wait
+
+        self._condition = threading.Condition()
+        self._seq = itertools.count()
+        self._waiting = []
+        self._running = {query_class: 0 for query_class in self.limits}
+        self._running_total = 0
+        self._running_by_user = {}
+        self._by_client = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a scheduler from the application Config"""
+        return cls(
+            limits={
+                'interactive': config.QUERY_LIMIT_INTERACTIVE,
+                'summary': config.QUERY_LIMIT_SUMMARY,
+                'triage': config.QUERY_LIMIT_TRIAGE,
+            },
+            priorities={
+                'interactive': 0,
+                'summary': 1,
+                'triage': 2,
+            },
+            timeouts={
+                'interactive': config.QUERY_TIMEOUT_INTERACTIVE_MS,
+                'summary': config.QUERY_TIMEOUT_SUMMARY_MS,
+                'triage': config.QUERY_TIMEOUT_TRIAGE_MS,
+            },
+            total_limit=config.QUERY_LIMIT_TOTAL,
+            max_wait=config.QUERY_MAX_WAIT_SECONDS,
+        )
+
+    @contextmanager
+    def slot(self, query_class, user_id=None, client_id=None, channel=None):
+        """Wait for a free slot of the given class and hold it for the block"""
+        if query_class not in self.limits:
+            raise ValueError(f"Unknown query class: {query_class}")
+
+        client_key = (user_id, client_id, channel) if client_id and channel else None
+        ticket = self._acquire(query_class, user_id, client_key)
+        try:
+            yield ticket
+        except Exception as e:
+            if ticket.cancelled:
+                raise QueryCancelled('Query superseded by a newer request') from e
+            raise
+        finally:
+            self._release(ticket)
+
+    def _acquire(self, query_class, user_id, client_key):
+        previous = None
+        with self._condition:
+            ticket = _Ticket(query_class, self.priorities[query_class],
+                             self.timeouts[query_class], user_id, client_key,
+                             next(self._seq))
+
+            if client_key is not None:
+                previous = self._by_client.get(client_key)
+                if previous is not None:
+                    previous.cancel()
+                self._by_client[client_key] = ticket
+
+            self._waiting.append(ticket)
+            self._condition.notify_all()
+
+        # Interrupt the superseded query outside the lock, so a slow cancel
+        # request does not hold up every other admission and release
+        if previous is not None:
+            previous.interrupt()
+
+        with self._condition:
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while True:
+                    if ticket.cancelled:
+                        raise QueryCancelled('Query superseded by a newer request')
+                    if self._next_ticket() is ticket:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise QueryRejected(
+                            f"Too many concurrent {query_class} queries, please retry"
+                        )
+                    self._condition.wait(remaining)
+            except Exception:
+                self._waiting.remove(ticket)
+                self._forget_client(ticket)
+                self._condition.notify_all()
+                raise
+
+            self._waiting.remove(ticket)
+            ticket.running = True
+            self._running[query_class] += 1
+            self._running_total += 1
+            self._running_by_user[user_id] = self._running_by_user.get(user_id, 0) + 1
+            return ticket
+
+    def _release(self, ticket):
+        ticket.unbind()
+        with self._condition:
+            self._running[ticket.query_class] -= 1
+            self._running_total -= 1
+            remaining = self._running_by_user.get(ticket.user_id, 1) - 1
+            if remaining:
+                self._running_by_user[ticket.user_id] = remaining
+            else:
+                self._running_by_user.pop(ticket.user_id, None)
+            self._forget_client(ticket)
+            self._condition.notify_all()
+
+    def _forget_client(self, ticket):
+        if ticket.client_key is not None and self._by_client.get(ticket.client_key) is ticket:
+            del self._by_client[ticket.client_key]
+
+    def _next_ticket(self):
+        """Pick the waiting ticket that should run next, if any slot is free"""
+        if self._running_total >= self.total_limit:
+            return None
+
+        candidates = [
+            t for t in self._waiting
+            if not t.cancelled and self._running[t.query_class] < self.limits[t.query_class]
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda t: (
+            t.priority, self._running_by_user.get(t.user_id, 0), t.seq
+        ))
@@ -0,0 +1,73 @@
+import logging
+import os
+import re
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql')
+
+# Postgres scripts in dependency order. Scripts flagged for autocommit run
+# statement by statement outside a transaction (CREATE INDEX CONCURRENTLY
+# cannot run inside one) and must not contain function bodies.
+# postgres_indexes.sql adds a stored column, which rewrites the table under an
+# ACCESS EXCLUSIVE lock the first time it runs: apply it off-peak.
+SCHEMA_SCRIPTS = [
+    ('postgres_content_blobs.sql', False),
+    ('postgres_indexes.sql', True),
+    ('postgres_functions.sql', False),
+]
+
+# Added by postgres_indexes.sql; the functions in postgres_functions.sql filter on it
+TIME_OF_DAY_COLUMN = ('tblconsoleerrorlogs', 'errortime_of_day')
+
+COLUMN_EXISTS_QUERY = text("""
+    SELECT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column
+    )
+""")
+
+def column_exists(engine, table, column):
+    """Whether a column exists on a table of the current schema"""
+    with engine.connect() as conn:
+        return conn.execute(COLUMN_EXISTS_QUERY, {'table': table, 'column': column}).scalar()
+
+def needs_table_rewrite(engine):
+    """Whether applying postgres_indexes.sql would still rewrite tblconsoleerrorlogs"""
+    return not column_exists(engine, *TIME_OF_DAY_COLUMN)
+
+def read_script(name):
+    """Read a script from the sql/ directory"""
+    with open(os.path.join(SQL_DIR, name)) as f:
+        return f.read()
+
+def split_statements(sql):
+    """Split a plain script (no $$ bodies) into statements"""
+    statements = []
+    for statement in re.split(r';\s*\n', sql):
+        lines = [line for line in statement.splitlines() if not line.strip().startswith('--')]
+        statement = '\n'.join(lines).strip().rstrip(';')
+        if statement:
+            statements.append(statement)
+    return statements
+
+def apply_script(engine, name, autocommit=False):
+    """Apply one script from the sql/ directory"""
+    sql = read_script(name)
+
+    if autocommit:
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            for statement in split_statements(sql):
+                conn.exec_driver_sql(statement)
+    else:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(sql)
+
+    logger.info(f"Applied {name}")
+
+def apply_schema(engine):
+    """Apply every Postgres script in dependency order"""
+    for name, autocommit in SCHEMA_SCRIPTS:
+        apply_script(engine, name, autocommit)
@@ -0,0 +1,19 @@
+# Gunicorn configuration (read automatically when gunicorn starts in this directory)
+#
+# The query scheduler in database/scheduler.py queues, prioritises and cancels
+# queries between the threads of one worker process. Sync workers serve a
+# single request at a time, so the scheduler would never see two queries at
+# once: use threaded workers with at least QUERY_LIMIT_TOTAL threads. Keep the
+# worker count low and scale with threads, so that a user's requests meet in
+# the same scheduler.
+
+import os
+
+from config import Config
+
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT') or 8000}"
+worker_class = 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS') or 1)
+# Two spare threads keep health probes and static files responsive while every query slot is busy
+threads = max(int(os.environ.get('GUNICORN_THREADS') or 0), Config.QUERY_LIMIT_TOTAL + 2)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 600)
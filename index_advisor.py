@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Index Advisor for the Console Error Logs Postgres functions
+
+Usage:
+    python index_advisor.py migrate              # apply sql/postgres_*.sql (indexes built CONCURRENTLY)
+    python index_advisor.py migrate --rewrite-table  # first run: also add the stored column (off-peak)
+    python index_advisor.py report               # capture plans and report index usage
+    python index_advisor.py report --analyze     # same, with EXPLAIN ANALYZE timings
+    python index_advisor.py report --seed 200000 # insert synthetic rows first (test databases only)
+
+The report runs EXPLAIN for every filter shape the front end sends to
+sp_getconsoleerrorlogs and sp_getconsoleerrorlogssummary. Sequential scans
+of tblconsoleerrorlogs are reported as missing indexes, and a Function Scan
+of an sp_ function means it was not inlined (e.g. an old plpgsql version is
+still installed), which hides its plan. Indexes on the table that no shape
+uses are reported as unused; INVALID indexes, left by an interrupted
+CREATE INDEX CONCURRENTLY and skipped by later migrate runs, are reported
+too. Exits with status 1 when any of these problems except unused indexes
+is found.
+"""
+
+import argparse
+import logging
+import sys
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from database.connection import DatabaseConnection
+from database.schema import apply_schema, needs_table_rewrite
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'tblconsoleerrorlogs'
+
+LOGS_CALL = "SELECT * FROM sp_getconsoleerrorlogs(:date_from, :date_to, :time_from, :time_to, :practice_id, 1, 25)"
+SUMMARY_CALL = "SELECT * FROM sp_getconsoleerrorlogssummary(:date_from, :date_to, :practice_id, 1, 25)"
+
+# (name, call, which sample filters are set) - empty strings mirror what the filter form sends
+QUERY_SHAPES = [
+    ('logs: date range', LOGS_CALL, ('date',)),
+    ('logs: date range + practice', LOGS_CALL, ('date', 'practice')),
+    ('logs: date range + time window', LOGS_CALL, ('date', 'time')),
+    ('logs: date range + practice + time window', LOGS_CALL, ('date', 'practice', 'time')),
+    ('summary: date range', SUMMARY_CALL, ('date',)),
+    ('summary: date range + practice', SUMMARY_CALL, ('date', 'practice')),
+]
+
+SAMPLE_QUERY = text(f"""
+    SELECT
+        MAX(insertdat)::DATE AS last_date,
+        (SELECT practiceid FROM {TABLE} WHERE practiceid IS NOT NULL LIMIT 1) AS practice_id
+    FROM {TABLE}
+""")
+
+SEED_QUERY = text(f"""
+    INSERT INTO {TABLE} (practiceid, stacktraces, errormassage, url, errortime, insertdat, updatedat, jirastatus, status)
+    SELECT
+        1000 + g % 50,
+        'TypeError at module' || g % 200 || '.js:' || g % 7,
+        'Cannot read properties of undefined (' || g % 200 || ')',
+        '/page/' || g % 30,
+        t.ts, t.ts, t.ts,
+        'false',
+        'Open'
+    FROM generate_series(1, :rows) g
+    CROSS JOIN LATERAL (
+        SELECT LOCALTIMESTAMP - (g % 180) * INTERVAL '1 day' - (g * 7919 % 86400) * INTERVAL '1 second' AS ts
+    ) t
+""")
+
+INDEX_QUERY = text("""
+    SELECT s.indexrelname, s.idx_scan, pg_size_pretty(pg_relation_size(s.indexrelid))
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.relname = :table AND NOT i.indisunique
+    ORDER BY s.indexrelname
+""")
+
+INVALID_INDEX_QUERY = text("""
+    SELECT c.relname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE i.indrelid = CAST(:table AS regclass) AND NOT i.indisvalid
+    ORDER BY c.relname
+""")
+
+def sample_filters(conn):
+    """Filter values that match data actually present in the database"""
+    row = conn.execute(SAMPLE_QUERY).fetchone()
+    if row is None or row[0] is None:
+        raise SystemExit(f"{TABLE} is empty - seed it first (--seed ROWS)")
+
+    last_date = row[0]
+    return {
+        'date': {
+            'date_from': (last_date - timedelta(days=7)).isoformat(),
+            'date_to': last_date.isoformat()
+        },
+        'time': {'time_from': '09:00', 'time_to': '10:00'},
+        'practice': {'practice_id': str(row[1])}
+    }
+
+def walk_plan(node):
+    """Yield every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk_plan(child)
+
+def explain(conn, call, params, analyze):
+    options = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+    result = conn.execute(text(f"EXPLAIN ({options}) {call}"), params).scalar()
+    return result[0]
+
+def report(engine, analyze):
+    missing = []
+    not_inlined = []
+    used_indexes = set()
+
+    with engine.connect() as conn:
+        samples = sample_filters(conn)
+
+        for name, call, filters in QUERY_SHAPES:
+            params = {'date_from': '', 'date_to': '', 'time_from': '', 'time_to': '', 'practice_id': ''}
+            for key in filters:
+                params.update(samples[key])
+
+            plan = explain(conn, call, params, analyze)
+            nodes = list(walk_plan(plan['Plan']))
+
+            indexes = sorted({n['Index Name'] for n in nodes if 'Index Name' in n})
+            used_indexes.update(indexes)
+            seq_scans = [n for n in nodes if n['Node Type'] == 'Seq Scan' and n.get('Relation Name') == TABLE]
+            function_scans = [
+                n for n in nodes
+                if n['Node Type'] == 'Function Scan' and n.get('Function Name', '').startswith('sp_')
+            ]
+
+            timing = f" ({plan['Execution Time']:.1f} ms)" if analyze else ''
+            print(f"{name}{timing}")
+            print(f"    indexes: {', '.join(indexes) or 'none'}")
+            for node in seq_scans:
+                condition = node.get('Filter', 'no filter')
+                print(f"    MISSING INDEX: sequential scan of {TABLE}, filter {condition}")
+                missing.append((name, condition))
+            for node in function_scans:
+                print(f"    NOT INLINED: {node['Function Name']} runs as an opaque function call, "
+                      "reinstall it with: python index_advisor.py migrate")
+                not_inlined.append(name)
+
+        rows = conn.execute(INDEX_QUERY, {'table': TABLE}).fetchall()
+        invalid = [row[0] for row in conn.execute(INVALID_INDEX_QUERY, {'table': TABLE}).fetchall()]
+
+    print()
+    unused = [row for row in rows if row[0] not in used_indexes]
+    if unused:
+        print(f"Indexes on {TABLE} not used by any query shape:")
+        for index_name, idx_scan, size in unused:
+            print(f"    {index_name} ({size}, {idx_scan} scans since stats reset)")
+    else:
+        print(f"Every index on {TABLE} is used by at least one query shape")
+
+    for index_name in invalid:
+        print(f"INVALID index {index_name} (interrupted concurrent build) - "
+              f"run DROP INDEX CONCURRENTLY {index_name}, then python index_advisor.py migrate")
+
+    if missing:
+        print(f"\n{len(missing)} query shape(s) scan {TABLE} sequentially - run: python index_advisor.py migrate")
+    if not_inlined:
+        print(f"\n{len(not_inlined)} query shape(s) call a function that is not inlined")
+    return 1 if missing or not_inlined or invalid else 0
+
+def seed(engine, rows):
+    with engine.begin() as conn:
+        conn.execute(SEED_QUERY, {'rows': rows})
+        conn.exec_driver_sql(f"ANALYZE {TABLE}")
+    logger.info(f"Inserted {rows} synthetic rows into {TABLE}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Capture query plans and report missing or unused indexes')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help='apply the Postgres schema, indexes and functions')
+    migrate_parser.add_argument('--rewrite-table', action='store_true',
+                                help=f'allow adding the stored time-of-day column, which rewrites {TABLE}')
+    report_parser = subparsers.add_parser('report', help='explain the shipped functions and report index usage')
+    report_parser.add_argument('--analyze', action='store_true', help='run EXPLAIN ANALYZE (executes the queries)')
+    report_parser.add_argument('--seed', type=int, default=0, metavar='ROWS',
+                               help='insert synthetic rows first; only for test databases')
+    args = parser.parse_args()
+
+    engine = DatabaseConnection().engine
+
+    if args.command == 'migrate':
+        if needs_table_rewrite(engine) and not args.rewrite_table:
+            logger.warning(
+                f"Adding errortime_of_day rewrites {TABLE} under an ACCESS EXCLUSIVE lock, "
+                "blocking reads and ingest until it finishes. Run off-peak with --rewrite-table."
+            )
+            return 1
+        apply_schema(engine)
+        return 0
+
+    if args.seed:
+        seed(engine, args.seed)
+    return report(engine, args.analyze)
+
+if __name__ == '__main__':
+    sys.exit(main())
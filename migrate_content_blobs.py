@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Storage Migration
+Moves stack traces and error messages of tblconsoleerrorlogs into tblerrorblobs
+
+Usage:
+    python index_advisor.py migrate --rewrite-table # once, off-peak (see below)
+    python migrate_content_blobs.py                 # apply blob schema and functions, then backfill
+    python migrate_content_blobs.py --skip-schema   # resume an interrupted backfill
+    python migrate_content_blobs.py --chunk-size 2000
+
+The backfill walks the table in id order and commits after every chunk, so
+it can be stopped and restarted at any time and never holds long locks.
+The hash foreign keys are created NOT VALID and validated once the backfill
+is done, without blocking reads or ingest.
+
+The functions in sql/postgres_functions.sql filter on the stored
+errortime_of_day column, whose creation rewrites the whole table. This tool
+never does that: it stops unless index_advisor.py migrate has already run.
+"""
+
+import argparse
+import logging
+import time
+
+from sqlalchemy import text
+
+from database.connection import DatabaseConnection
+from database.schema import apply_script, needs_table_rewrite
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+NEXT_CHUNK_QUERY = text("""
+    SELECT MAX(id) FROM (
+        SELECT id
+        FROM tblconsoleerrorlogs
+        WHERE id > :after_id
+        ORDER BY id
+        LIMIT :chunk_size
+    ) chunk
+""")
+
+STORE_BLOBS_QUERY = text("""
+    INSERT INTO tblerrorblobs (hash, content)
+    SELECT DISTINCT sha256(convert_to(c.content, 'UTF8')), c.content
+    FROM (
+        SELECT stacktraces AS content
+        FROM tblconsoleerrorlogs
+        WHERE id > :after_id AND id <= :upto_id AND stacktraces IS NOT NULL
+        UNION
+        SELECT errormassage AS content
+        FROM tblconsoleerrorlogs
+        WHERE id > :after_id AND id <= :upto_id AND errormassage IS NOT NULL
+    ) c
+    ON CONFLICT (hash) DO NOTHING
+""")
+
+LINK_ROWS_QUERY = text("""
+    UPDATE tblconsoleerrorlogs
+    SET
+        stacktrace_hash = COALESCE(sha256(convert_to(stacktraces, 'UTF8')), stacktrace_hash),
+        message_hash = COALESCE(sha256(convert_to(errormassage, 'UTF8')), message_hash),
+        stacktraces = NULL,
+        errormassage = NULL
+    WHERE id > :after_id AND id <= :upto_id
+        AND (stacktraces IS NOT NULL OR errormassage IS NOT NULL)
+""")
+
+def backfill(engine, chunk_size, pause):
+    """Move existing text into the blob table, one committed chunk at a time"""
+    after_id = 0
+    total_rows = 0
+    started = time.monotonic()
+
+    while True:
+        with engine.begin() as conn:
+            upto_id = conn.execute(NEXT_CHUNK_QUERY, {
+                'after_id': after_id,
+                'chunk_size': chunk_size
+            }).scalar()
+            if upto_id is None:
+                break
+
+            params = {'after_id': after_id, 'upto_id': upto_id}
+            conn.execute(STORE_BLOBS_QUERY, params)
+            rows = conn.execute(LINK_ROWS_QUERY, params).rowcount
+
+        total_rows += rows
+        after_id = upto_id
+        logger.info(f"Backfilled up to id {upto_id} ({total_rows} rows moved)")
+
+        if pause:
+            time.sleep(pause)
+
+    logger.info(f"Backfill finished: {total_rows} rows moved in {time.monotonic() - started:.1f}s")
+    logger.info("Run VACUUM (ANALYZE) tblconsoleerrorlogs so the space of the old text columns is reused")
+    logger.info("To shrink the table on disk, run VACUUM FULL off-peak (exclusive lock) or pg_repack")
+
+HASH_FOREIGN_KEYS = [
+    'tblconsoleerrorlogs_stacktrace_hash_fkey',
+    'tblconsoleerrorlogs_message_hash_fkey',
+]
+
+def validate_foreign_keys(engine):
+    """Validate the NOT VALID hash foreign keys, one transaction each"""
+    for constraint in HASH_FOREIGN_KEYS:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"ALTER TABLE tblconsoleerrorlogs VALIDATE CONSTRAINT {constraint}")
+        logger.info(f"Validated {constraint}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Move error text into content-addressed storage')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='rows per committed chunk')
+    parser.add_argument('--pause', type=float, default=0.0, help='seconds to sleep between chunks')
+    parser.add_argument('--skip-schema', action='store_true', help='only run the backfill')
+    args = parser.parse_args()
+
+    engine = DatabaseConnection().engine
+
+    if not args.skip_schema:
+        if needs_table_rewrite(engine):
+            raise SystemExit(
+                "tblconsoleerrorlogs has no errortime_of_day column yet. Adding it rewrites the "
+                "table under an exclusive lock; run it off-peak first: "
+                "python index_advisor.py migrate --rewrite-table"
+            )
+        apply_script(engine, 'postgres_content_blobs.sql')
+        apply_script(engine, 'postgres_functions.sql')
+    backfill(engine, args.chunk_size, args.pause)
+    validate_foreign_keys(engine)
+
+if __name__ == '__main__':
+    main()
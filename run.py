@@ -4,8 +4,7 @@ Console Error Logs Web Application
 Entry point for running the Flask application
 """
 
-from app import app
-from database.db_service import DatabaseService
+from app import app, db_service
 import logging
 
 # Configure logging
@@ -17,9 +16,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def test_database_connection():
-    """Test database connection on startup"""
+    """Test database connection on startup using the app's own pool"""
     try:
-        db_service = DatabaseService()
         if db_service.test_connection():
             logger.info("Database connection test successful")
             return True
@@ -33,11 +31,11 @@ def test_database_connection():
 if __name__ == '__main__':
     logger.info("Starting Console Error Logs Web Application")
     
-    # Test database connection
-    if test_database_connection():
-        logger.info("Starting Flask development server...")
-        app.run(debug=True, host='0.0.0.0', port=5000)
-    else:
-        logger.error("Cannot start application - database connection failed")
+    # Test database connection; the app still starts and reports not ready until it is reachable
+    if not test_database_connection():
+        logger.warning("Database is not reachable yet - /api/health/ready will report 503")
         print("\nPlease check your database configuration in the .env file")
         print("Copy .env.example to .env and update with your database settings")
+
+    logger.info("Starting Flask development server...")
+    app.run(debug=True, host='0.0.0.0', port=5000)
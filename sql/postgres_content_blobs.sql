@@ -0,0 +1,102 @@
+-- =============================================
+-- Console Error Logs Web Application
+-- Postgres content-addressed storage for stack traces and messages
+-- =============================================
+--
+-- Every distinct stack trace / error message is stored once in
+-- tblerrorblobs, keyed by its SHA-256 digest. Error rows only keep the
+-- digests. Writers can keep inserting into the stacktraces and
+-- errormassage columns: the trigger below moves the text into the blob
+-- table and clears the columns. Existing rows are moved by
+-- migrate_content_blobs.py in chunks.
+
+-- 1. Blob table
+-- =============================================
+CREATE TABLE IF NOT EXISTS tblerrorblobs (
+    hash BYTEA PRIMARY KEY,
+    content TEXT NOT NULL
+);
+
+-- 2. Digest columns on the error table
+-- =============================================
+ALTER TABLE tblconsoleerrorlogs
+    ADD COLUMN IF NOT EXISTS stacktrace_hash BYTEA,
+    ADD COLUMN IF NOT EXISTS message_hash BYTEA;
+
+-- Foreign keys are added NOT VALID so existing rows are not scanned under
+-- the ALTER TABLE lock; new rows are still checked. migrate_content_blobs.py
+-- validates them afterwards in separate transactions, which only take a
+-- SHARE UPDATE EXCLUSIVE lock and do not block reads or ingest.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'tblconsoleerrorlogs_stacktrace_hash_fkey') THEN
+        ALTER TABLE tblconsoleerrorlogs
+            ADD CONSTRAINT tblconsoleerrorlogs_stacktrace_hash_fkey
+            FOREIGN KEY (stacktrace_hash) REFERENCES tblerrorblobs (hash) NOT VALID;
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'tblconsoleerrorlogs_message_hash_fkey') THEN
+        ALTER TABLE tblconsoleerrorlogs
+            ADD CONSTRAINT tblconsoleerrorlogs_message_hash_fkey
+            FOREIGN KEY (message_hash) REFERENCES tblerrorblobs (hash) NOT VALID;
+    END IF;
+END;
+$$;
+
+-- The fingerprint index on these columns is built CONCURRENTLY in
+-- postgres_indexes.sql
+
+-- 3. Helper to store a blob and return its digest
+-- =============================================
+CREATE OR REPLACE FUNCTION fn_store_error_blob(p_content TEXT)
+RETURNS BYTEA
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_hash BYTEA;
+BEGIN
+    IF p_content IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    v_hash := sha256(convert_to(p_content, 'UTF8'));
+
+    INSERT INTO tblerrorblobs (hash, content)
+    VALUES (v_hash, p_content)
+    ON CONFLICT (hash) DO NOTHING;
+
+    RETURN v_hash;
+END;
+$$;
+
+-- 4. Move text written by the ingest into the blob table
+-- =============================================
+CREATE OR REPLACE FUNCTION fn_tblconsoleerrorlogs_store_blobs()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.stacktraces IS NOT NULL THEN
+        NEW.stacktrace_hash := fn_store_error_blob(NEW.stacktraces);
+        NEW.stacktraces := NULL;
+    END IF;
+
+    IF NEW.errormassage IS NOT NULL THEN
+        NEW.message_hash := fn_store_error_blob(NEW.errormassage);
+        NEW.errormassage := NULL;
+    END IF;
+
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_tblconsoleerrorlogs_store_blobs ON tblconsoleerrorlogs;
+
+CREATE TRIGGER trg_tblconsoleerrorlogs_store_blobs
+    BEFORE INSERT OR UPDATE OF stacktraces, errormassage ON tblconsoleerrorlogs
+    FOR EACH ROW
+    EXECUTE FUNCTION fn_tblconsoleerrorlogs_store_blobs();
+
+-- 5. Remove the unused read view created by earlier versions of this script
+-- =============================================
+DROP VIEW IF EXISTS vwconsoleerrorlogs;
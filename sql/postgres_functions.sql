@@ -0,0 +1,156 @@
+-- =============================================
+-- Console Error Logs Web Application
+-- Postgres functions called by DatabaseService
+-- =============================================
+--
+-- Requires sql/postgres_content_blobs.sql and sql/postgres_indexes.sql.
+-- Stack traces and messages are resolved from tblerrorblobs only for the
+-- rows of the requested page.
+--
+-- Both functions are single-SELECT STABLE SQL functions, so Postgres
+-- inlines them into the calling query: filters whose argument is empty
+-- fold away at plan time and the remaining predicates (all written against
+-- bare indexed columns) can use the indexes in sql/postgres_indexes.sql.
+-- EXPLAIN on the function call shows the real plan, which
+-- index_advisor.py relies on.
+
+-- 1. Function to Retrieve Filtered Data
+-- =============================================
+CREATE OR REPLACE FUNCTION sp_getconsoleerrorlogs(
+    p_datefrom TEXT DEFAULT NULL,
+    p_dateto TEXT DEFAULT NULL,
+    p_timefrom TEXT DEFAULT NULL,
+    p_timeto TEXT DEFAULT NULL,
+    p_practiceid TEXT DEFAULT NULL,
+    p_page INT DEFAULT 1,
+    p_perpage INT DEFAULT 25
+)
+RETURNS TABLE (
+    id INT,
+    practiceid INT,
+    stacktraces TEXT,
+    errormassage TEXT,
+    url TEXT,
+    errortime TIMESTAMP,
+    insertdat TIMESTAMP,
+    updatedat TIMESTAMP,
+    jirastatus TEXT,
+    status TEXT,
+    llmsolution TEXT,
+    totalcount BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH page AS (
+        SELECT
+            l.id,
+            l.practiceid,
+            l.stacktraces,
+            l.errormassage,
+            l.stacktrace_hash,
+            l.message_hash,
+            l.url,
+            l.errortime,
+            l.insertdat,
+            l.updatedat,
+            l.jirastatus,
+            l.status,
+            l.llmsolution,
+            COUNT(1) OVER () AS totalcount
+        FROM tblconsoleerrorlogs l
+        WHERE
+            (NULLIF(btrim(p_datefrom), '') IS NULL OR l.insertdat >= NULLIF(btrim(p_datefrom), '')::DATE)
+            AND (NULLIF(btrim(p_dateto), '') IS NULL OR l.insertdat < NULLIF(btrim(p_dateto), '')::DATE + 1)
+            AND (NULLIF(btrim(p_timefrom), '') IS NULL OR l.errortime_of_day >= NULLIF(btrim(p_timefrom), '')::TIME)
+            AND (NULLIF(btrim(p_timeto), '') IS NULL OR l.errortime_of_day <= NULLIF(btrim(p_timeto), '')::TIME)
+            AND (NULLIF(btrim(p_practiceid), '') IS NULL OR l.practiceid = NULLIF(btrim(p_practiceid), '')::INT)
+        ORDER BY l.errortime DESC
+        LIMIT CASE WHEN p_perpage IS NULL OR p_perpage < 1 THEN 25 ELSE p_perpage END
+        OFFSET (GREATEST(COALESCE(p_page, 1), 1) - 1)
+            * CASE WHEN p_perpage IS NULL OR p_perpage < 1 THEN 25 ELSE p_perpage END
+    )
+    SELECT
+        p.id::INT,
+        p.practiceid::INT,
+        COALESCE(st.content, p.stacktraces)::TEXT,
+        COALESCE(msg.content, p.errormassage)::TEXT,
+        p.url::TEXT,
+        p.errortime::TIMESTAMP,
+        p.insertdat::TIMESTAMP,
+        p.updatedat::TIMESTAMP,
+        p.jirastatus::TEXT,
+        p.status::TEXT,
+        p.llmsolution::TEXT,
+        p.totalcount
+    FROM page p
+    LEFT JOIN tblerrorblobs st ON st.hash = p.stacktrace_hash
+    LEFT JOIN tblerrorblobs msg ON msg.hash = p.message_hash
+    ORDER BY p.errortime DESC;
+$$;
+
+-- 2. Function to Retrieve Aggregated Data (Common Logs)
+-- =============================================
+-- Groups on the 32-byte digests instead of the full text. Rows that have
+-- not been backfilled yet are hashed on the fly so they group correctly.
+-- The fingerprint column ("<stacktrace hash>:<message hash>" in hex) is
+-- what /api/logs/triage accepts to update every occurrence of an error.
+DROP FUNCTION IF EXISTS sp_getconsoleerrorlogssummary(TEXT, TEXT, TEXT, INT, INT);
+
+CREATE FUNCTION sp_getconsoleerrorlogssummary(
+    p_datefrom TEXT DEFAULT NULL,
+    p_dateto TEXT DEFAULT NULL,
+    p_practiceid TEXT DEFAULT NULL,
+    p_page INT DEFAULT 1,
+    p_perpage INT DEFAULT 25
+)
+RETURNS TABLE (
+    practiceids TEXT,
+    stacktraces TEXT,
+    errormassage TEXT,
+    llmsolution TEXT,
+    errorcount BIGINT,
+    fingerprint TEXT,
+    totalcount BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH grouped AS (
+        SELECT
+            COALESCE(l.stacktrace_hash, sha256(convert_to(l.stacktraces, 'UTF8'))) AS stacktrace_hash,
+            COALESCE(l.message_hash, sha256(convert_to(l.errormassage, 'UTF8'))) AS message_hash,
+            string_agg(DISTINCT l.practiceid::TEXT, ', ') AS practiceids,
+            MAX(l.stacktraces) AS legacy_stacktraces,
+            MAX(l.errormassage) AS legacy_errormassage,
+            MAX(l.llmsolution) AS llmsolution,
+            COUNT(1) AS errorcount
+        FROM tblconsoleerrorlogs l
+        WHERE
+            (NULLIF(btrim(p_datefrom), '') IS NULL OR l.insertdat >= NULLIF(btrim(p_datefrom), '')::DATE)
+            AND (NULLIF(btrim(p_dateto), '') IS NULL OR l.insertdat < NULLIF(btrim(p_dateto), '')::DATE + 1)
+            AND (NULLIF(btrim(p_practiceid), '') IS NULL OR l.practiceid = NULLIF(btrim(p_practiceid), '')::INT)
+        GROUP BY 1, 2
+    ), page AS (
+        SELECT
+            g.*,
+            COUNT(1) OVER () AS totalcount
+        FROM grouped g
+        ORDER BY g.errorcount DESC
+        LIMIT CASE WHEN p_perpage IS NULL OR p_perpage < 1 THEN 25 ELSE p_perpage END
+        OFFSET (GREATEST(COALESCE(p_page, 1), 1) - 1)
+            * CASE WHEN p_perpage IS NULL OR p_perpage < 1 THEN 25 ELSE p_perpage END
+    )
+    SELECT
+        p.practiceids,
+        COALESCE(st.content, p.legacy_stacktraces)::TEXT,
+        COALESCE(msg.content, p.legacy_errormassage)::TEXT,
+        p.llmsolution::TEXT,
+        p.errorcount,
+        COALESCE(encode(p.stacktrace_hash, 'hex'), '') || ':' || COALESCE(encode(p.message_hash, 'hex'), ''),
+        p.totalcount
+    FROM page p
+    LEFT JOIN tblerrorblobs st ON st.hash = p.stacktrace_hash
+    LEFT JOIN tblerrorblobs msg ON msg.hash = p.message_hash
+    ORDER BY p.errorcount DESC;
+$$;
@@ -0,0 +1,41 @@
+-- =============================================
+-- Console Error Logs Web Application
+-- Postgres indexes for the filters used by sp_getconsoleerrorlogs
+-- and sp_getconsoleerrorlogssummary
+-- =============================================
+--
+-- Statements run one by one outside a transaction (see
+-- database/schema.py) so the indexes can be built CONCURRENTLY without
+-- blocking ingest. Check the plans with: python index_advisor.py report
+
+-- 1. Stored time-of-day column
+-- =============================================
+-- Filtering on CAST(errortime AS TIME) cannot use an index, the stored
+-- copy can. Adding it rewrites the table once, so run it off-peak.
+ALTER TABLE tblconsoleerrorlogs
+    ADD COLUMN IF NOT EXISTS errortime_of_day TIME GENERATED ALWAYS AS (errortime::TIME) STORED;
+
+-- The functions read most columns of every matching row, so the indexes
+-- only narrow the scan; extra INCLUDE columns would not give index-only
+-- scans and would slow down ingest.
+
+-- 2. Practice + date range (practice filter, with or without dates)
+-- =============================================
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tblconsoleerrorlogs_practice_insertdat
+    ON tblconsoleerrorlogs (practiceid, insertdat);
+
+-- 3. Date range + time-of-day window (default page load and time filters;
+-- the front end always sends a date range)
+-- =============================================
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tblconsoleerrorlogs_insertdat_timeofday
+    ON tblconsoleerrorlogs (insertdat, errortime_of_day);
+
+-- Time-of-day-first index from earlier versions; no query shape leads with the time window
+DROP INDEX CONCURRENTLY IF EXISTS ix_tblconsoleerrorlogs_timeofday_insertdat;
+
+-- 4. Fingerprint (summary grouping, bulk triage walking rows by id)
+-- =============================================
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tblconsoleerrorlogs_fingerprint
+    ON tblconsoleerrorlogs (stacktrace_hash, message_hash, id);
+
+ANALYZE tblconsoleerrorlogs;
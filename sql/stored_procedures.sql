@@ -3,6 +3,31 @@
 -- SQL Server Stored Procedures
 -- =============================================
 
+-- 0. Indexed time-of-day column and filter indexes
+-- =============================================
+-- CAST(ErrorTime AS TIME) per row cannot use an index, the persisted
+-- computed column can. The procedures read most columns of each matching
+-- row, so the indexes only narrow the scan and carry no INCLUDE columns.
+IF COL_LENGTH(N'LOG.tblconsoleErrorLogs', N'ErrorTimeOfDay') IS NULL
+    ALTER TABLE [LOG].[tblconsoleErrorLogs]
+        ADD [ErrorTimeOfDay] AS CAST([ErrorTime] AS TIME) PERSISTED;
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID(N'[LOG].[tblconsoleErrorLogs]') AND name = N'IX_tblconsoleErrorLogs_Practice_InsertDat')
+    CREATE NONCLUSTERED INDEX [IX_tblconsoleErrorLogs_Practice_InsertDat]
+    ON [LOG].[tblconsoleErrorLogs] ([practiceid] ASC, [insertdat] ASC);
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID(N'[LOG].[tblconsoleErrorLogs]') AND name = N'IX_tblconsoleErrorLogs_InsertDat_TimeOfDay')
+    CREATE NONCLUSTERED INDEX [IX_tblconsoleErrorLogs_InsertDat_TimeOfDay]
+    ON [LOG].[tblconsoleErrorLogs] ([insertdat] ASC, [ErrorTimeOfDay] ASC);
+GO
+
+-- The front end always sends a date range, so no query leads with the time window
+IF EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID(N'[LOG].[tblconsoleErrorLogs]') AND name = N'IX_tblconsoleErrorLogs_TimeOfDay_InsertDat')
+    DROP INDEX [IX_tblconsoleErrorLogs_TimeOfDay_InsertDat] ON [LOG].[tblconsoleErrorLogs];
+GO
+
 -- 1. Stored Procedure to Retrieve Filtered Data
 -- =============================================
 IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[LOG].[sp_GetConsoleErrorLogs]') AND type in (N'P', N'PC'))
@@ -51,10 +76,11 @@ BEGIN
             Status
         FROM LOG.tblconsoleErrorLogs
         WHERE
-            (@DateFrom IS NULL OR CAST(insertdat AS DATE) >= @DateFrom)
-            AND (@DateTo IS NULL OR CAST(insertdat AS DATE) <= @DateTo)
-            AND (@TimeFrom IS NULL OR LTRIM(RTRIM(@TimeFrom)) = '' OR CAST(ErrorTime AS TIME) >= @TimeFromConv)
-            AND (@TimeTo IS NULL OR LTRIM(RTRIM(@TimeTo)) = '' OR CAST(ErrorTime AS TIME) <= @TimeToConv)
+            (@DateFrom IS NULL OR insertdat >= CAST(@DateFrom AS DATE))
+            AND (@DateTo IS NULL OR insertdat < DATEADD(DAY, 1, CAST(@DateTo AS DATE)))
+            -- Empty parameters disable a filter; invalid ones (TRY_CAST gave NULL) match nothing
+            AND (@TimeFrom IS NULL OR LTRIM(RTRIM(@TimeFrom)) = '' OR ErrorTimeOfDay >= @TimeFromConv)
+            AND (@TimeTo IS NULL OR LTRIM(RTRIM(@TimeTo)) = '' OR ErrorTimeOfDay <= @TimeToConv)
             AND (@PracticeID IS NULL OR LTRIM(RTRIM(@PracticeID)) = '' OR practiceid = @PracticeIDInt)
     ), Numbered AS (
         SELECT
@@ -77,7 +103,9 @@ BEGIN
         TotalCount
     FROM Numbered
     WHERE RowNum BETWEEN ((@Page - 1) * @PerPage + 1) AND (@Page * @PerPage)
-    ORDER BY RowNum;
+    ORDER BY RowNum
+    -- Plan for the filters actually supplied so the unused ones drop out and the indexes apply
+    OPTION (RECOMPILE);
 END;
 GO
 
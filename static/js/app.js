@@ -2,6 +2,10 @@ $(document).ready(function() {
     let logsTable;
     let practiceIdsLoaded = false;
 
+    // Per-tab id so the server can cancel queries superseded by a newer request
+    const clientId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    $.ajaxSetup({ headers: { 'X-Client-Id': clientId } });
+
     // Initialize the application
     initializeApp();
 
@@ -87,6 +91,256 @@ $(document).ready(function() {
         });
     }
     
+    // Pages fetched per request; neighbouring pages are then served from the cache
+    const PIPELINE_PAGES = 5;
+    const PIPELINE_CACHE_TTL = 60000;
+    const PIPELINE_CACHE_KEYS = 20;
+    // Characters of long text cells rendered in the table; the full text opens in a modal
+    const TEXT_PREVIEW_LENGTH = 600;
+
+    const logsPipeline = createPipeline({
+        url: '/api/logs',
+        params: function() {
+            return new URLSearchParams(new FormData($('#filterForm')[0]));
+        },
+        mapRow: function(log) {
+            return [
+                log.id || '',                // ID
+                log.practiceid || '',        // Practice ID
+                log.ErrorMassage || '',      // Error Message
+                log.url || '',               // URL
+                log.ErrorTime || '',         // Error Time
+                log.stacktraces || '',       // Stack Trace
+                log.LLMSolution || '',       // LLMSolution
+                log.JiraStatus || '',        // Jira Status
+                log.insertdat || '',         // Inserted At
+                `<button class=\"btn btn-sm btn-primary me-1 btn-edit\" data-id=\"${log.id}\">\n                    <i class=\"fas fa-edit\"></i> Edit\n                </button>\n                <button class=\"btn btn-sm btn-danger btn-delete\" data-id=\"${log.id}\">\n                    <i class=\"fas fa-trash\"></i> Delete\n                </button>`
+            ];
+        },
+        errorMessage: 'Failed to load data'
+    });
+
+    const summaryPipeline = createPipeline({
+        url: '/api/logs-summary',
+        params: function() {
+            const params = new URLSearchParams(new FormData($('#filterForm')[0]));
+            params.delete('time_from');
+            params.delete('time_to');
+            return params;
+        },
+        mapRow: function(log) {
+            return [
+                log.practiceids || '',
+                log.stacktraces || '',
+                log.ErrorMassage || '',
+                log.LLMSolution || '',
+                log.ErrorCount || 0
+            ];
+        },
+        errorMessage: 'Failed to load summary data',
+        // Every block re-runs the full aggregation; only fetch what the user asks for
+        prefetch: false
+    });
+
+    // Data pipeline for a server-side DataTable: asks for PIPELINE_PAGES pages per
+    // request, serves neighbouring pages from a cache keyed by the filters,
+    // prefetches the next block while the browser is idle and aborts requests
+    // that a newer draw has replaced (pass prefetch: false to only fetch on
+    // demand). The server may return fewer pages (MAX_FETCH_PAGES), so blocks
+    // are laid out from the `page` and `pages` it reports rather than assumed.
+    function createPipeline(options) {
+        const cache = new Map();    // filter key -> { time, total, pages: Map(page -> rows) }
+        const pending = new Map();  // filter key + '#' + first page of the block -> jqXHR
+        let current = null;         // pending key of the request the table is waiting for
+        let blockSize = PIPELINE_PAGES;  // pages per response, as last reported by the server
+
+        function blockStart(page) {
+            return Math.floor((page - 1) / blockSize) * blockSize + 1;
+        }
+
+        function cachedPage(key, page) {
+            const entry = cache.get(key);
+            if (!entry) {
+                return null;
+            }
+            if (Date.now() - entry.time > PIPELINE_CACHE_TTL) {
+                cache.delete(key);
+                return null;
+            }
+            const rows = entry.pages.get(page);
+            return rows ? { rows: rows, total: entry.total } : null;
+        }
+
+        function storeResponse(key, perPage, response) {
+            let entry = cache.get(key);
+            if (!entry || Date.now() - entry.time > PIPELINE_CACHE_TTL) {
+                entry = { time: Date.now(), total: 0, pages: new Map() };
+            }
+            // Re-insert so the Map keeps least recently used keys first
+            cache.delete(key);
+            cache.set(key, entry);
+
+            const rows = response.data || [];
+            const first = response.page || 1;
+            const pages = response.pages || 1;
+            entry.total = response.total || 0;
+            for (let i = 0; i < pages; i++) {
+                const pageRows = rows.slice(i * perPage, (i + 1) * perPage);
+                // Pages past the end of the results are not cached, except an empty first page
+                if (pageRows.length || i === 0) {
+                    entry.pages.set(first + i, pageRows);
+                }
+            }
+
+            while (cache.size > PIPELINE_CACHE_KEYS) {
+                cache.delete(cache.keys().next().value);
+            }
+        }
+
+        function fetchPages(key, params, page, perPage, foreground) {
+            const pendingKey = key + '#' + blockStart(page);
+            if (pending.has(pendingKey)) {
+                return pending.get(pendingKey);
+            }
+
+            // Ask for the page itself: the server aligns the block around it
+            const query = new URLSearchParams(params);
+            query.set('page', page);
+            query.set('per_page', perPage);
+            query.set('pages', PIPELINE_PAGES);
+
+            const xhr = $.ajax({
+                url: options.url + '?' + query.toString(),
+                method: 'GET',
+                // Prefetches must not supersede the request the user is waiting for
+                headers: foreground ? {} : { 'X-Client-Id': '' }
+            });
+            pending.set(pendingKey, xhr);
+            xhr.done(function(response) {
+                blockSize = response.pages || 1;
+                storeResponse(key, perPage, response);
+            });
+            xhr.always(function() {
+                pending.delete(pendingKey);
+            });
+            return xhr;
+        }
+
+        function schedulePrefetch(key, params, page, perPage, total) {
+            if (options.prefetch === false || (page - 1) * perPage >= total || cachedPage(key, page)) {
+                return;
+            }
+            const whenIdle = window.requestIdleCallback || function(fn) { return setTimeout(fn, 200); };
+            whenIdle(function() {
+                // Skip if the filters changed while waiting
+                if (options.params().toString() + '|' + perPage === key) {
+                    fetchPages(key, params, page, perPage, false);
+                }
+            });
+        }
+
+        function ajax(data, callback) {
+            const perPage = data.length;
+            const page = Math.floor(data.start / perPage) + 1;
+            const params = options.params();
+            const key = params.toString() + '|' + perPage;
+            const pendingKey = key + '#' + blockStart(page);
+
+            // Anything loading for other filters, or for the page the user just left, is stale
+            pending.forEach(function(xhr, otherKey) {
+                if (otherKey.indexOf(key + '#') !== 0 || (otherKey === current && otherKey !== pendingKey)) {
+                    xhr.abort();
+                }
+            });
+
+            function draw(value) {
+                updateRecordCount(value.total);
+                showLoading(false);
+                callback({
+                    draw: data.draw,
+                    recordsTotal: value.total,
+                    recordsFiltered: value.total,
+                    data: value.rows.map(options.mapRow)
+                });
+                schedulePrefetch(key, params, blockStart(page) + blockSize, perPage, value.total);
+            }
+
+            function fail(xhr, status) {
+                if (status === 'abort' || isSuperseded(xhr)) {
+                    return; // A newer request for this table replaced this one
+                }
+                showLoading(false);
+                let errorMessage = options.errorMessage;
+                if (xhr.responseJSON && xhr.responseJSON.error) {
+                    errorMessage += ': ' + xhr.responseJSON.error;
+                }
+                showError(errorMessage);
+                callback({ draw: data.draw, recordsTotal: 0, recordsFiltered: 0, data: [] });
+            }
+
+            const cached = cachedPage(key, page);
+            if (cached) {
+                hideError();
+                draw(cached);
+                return;
+            }
+
+            showLoading(true);
+            hideError();
+            current = pendingKey;
+
+            fetchPages(key, params, page, perPage, true)
+                .done(function(response) {
+                    const value = cachedPage(key, page);
+                    if (value) {
+                        draw(value);
+                    } else if (response.page <= page && page < response.page + (response.pages || 1)) {
+                        draw({ rows: [], total: response.total || 0 });  // past the last page
+                    } else {
+                        // A shared in-flight request was laid out differently; fetch this page itself
+                        fetchPages(key, params, page, perPage, true)
+                            .done(function() {
+                                draw(cachedPage(key, page) || { rows: [], total: 0 });
+                            })
+                            .fail(fail);
+                    }
+                })
+                .fail(fail);
+        }
+
+        function clear() {
+            pending.forEach(function(xhr) {
+                xhr.abort();
+            });
+            cache.clear();
+        }
+
+        return { ajax: ajax, clear: clear };
+    }
+
+    // Render only the start of long text; the full value stays in the row data
+    function renderPreview(cssClass, title) {
+        return function(data, type) {
+            if (type === 'display' && data) {
+                const preview = data.length > TEXT_PREVIEW_LENGTH
+                    ? data.substring(0, TEXT_PREVIEW_LENGTH) + '...'
+                    : data;
+                const titleAttr = title ? ` title="${title}" style="cursor: pointer;"` : '';
+                return `<div class="${cssClass}"${titleAttr}>${escapeHtml(preview)}</div>`;
+            }
+            return data || '';
+        };
+    }
+
+    // Full cell value behind a rendered element, also inside Responsive child rows
+    function cellValue(table, element, column) {
+        const childItem = $(element).closest('[data-dt-row]');
+        const rowIndex = childItem.length
+            ? childItem.data('dt-row')
+            : table.row($(element).closest('tr')).index();
+        return table.row(rowIndex).data()[column];
+    }
+
     function initializeDataTable() {
         logsTable = $('#logsTable').DataTable({
             processing: true,
@@ -97,60 +351,7 @@ $(document).ready(function() {
             pageLength: 25,
             lengthMenu: [[10, 25, 50, 100], [10, 25, 50, 100]],
             order: [[4, 'desc']],
-            ajax: function(data, callback) {
-                // Map DataTables params to our API
-                const page = Math.floor(data.start / data.length) + 1;
-                const perPage = data.length;
-
-                const formData = new FormData($('#filterForm')[0]);
-                const params = new URLSearchParams(formData);
-                params.set('page', page);
-                params.set('per_page', perPage);
-
-                showLoading(true);
-                hideError();
-
-                $.ajax({
-                    url: '/api/logs?' + params.toString(),
-                    method: 'GET',
-                    success: function(response) {
-                        // Transform to DataTables expected format
-                        const rows = (response.data || []).map(function(log) {
-                            return [
-                                log.id || '',                // ID
-                                log.practiceid || '',        // Practice ID
-                                log.ErrorMassage || '',      // Error Message
-                                log.url || '',               // URL
-                                log.ErrorTime || '',         // Error Time
-                                log.stacktraces || '',       // Stack Trace
-                                log.LLMSolution || '',       // LLMSolution
-                                log.JiraStatus || '',        // Jira Status
-                                log.insertdat || '',         // Inserted At
-                                `<button class=\"btn btn-sm btn-primary me-1 btn-edit\" data-id=\"${log.id}\">\n                                    <i class=\"fas fa-edit\"></i> Edit\n                                </button>\n                                <button class=\"btn btn-sm btn-danger btn-delete\" data-id=\"${log.id}\">\n                                    <i class=\"fas fa-trash\"></i> Delete\n                                </button>`
-                            ];
-                        });
-
-                        updateRecordCount(response.total || rows.length);
-                        showLoading(false);
-
-                        callback({
-                            draw: data.draw,
-                            recordsTotal: response.total || rows.length,
-                            recordsFiltered: response.total || rows.length,
-                            data: rows
-                        });
-                    },
-                    error: function(xhr, status, error) {
-                        showLoading(false);
-                        let errorMessage = 'Failed to load data';
-                        if (xhr.responseJSON && xhr.responseJSON.error) {
-                            errorMessage += ': ' + xhr.responseJSON.error;
-                        }
-                        showError(errorMessage);
-                        callback({ draw: data.draw, recordsTotal: 0, recordsFiltered: 0, data: [] });
-                    }
-                });
-            },
+            ajax: logsPipeline.ajax,
             columnDefs: [
                 {
                     targets: [0], // ID column - now visible
@@ -167,32 +368,15 @@ $(document).ready(function() {
                 },
                 {
                     targets: [5], // Stack trace column
-                    render: function(data, type, row) {
-                        if (type === 'display' && data) {
-                            return `<div class="stacktrace-multiline" title="Click to view full stack trace"
-                                    style="cursor: pointer;"
-                                    onclick="showStackTrace('${escapeHtml(data)}')">${escapeHtml(data)}</div>`;
-                        }
-                        return data || '';
-                    }
+                    render: renderPreview('stacktrace-multiline', 'Click to view full stack trace')
                 },
                 {
                     targets: [6], // LLMSolution column (multiline similar to error message)
-                    render: function(data, type, row) {
-                        if (type === 'display' && data) {
-                            return `<div class="error-message-multiline">${escapeHtml(data)}</div>`;
-                        }
-                        return data || '';
-                    }
+                    render: renderPreview('error-message-multiline')
                 },
                 {
                     targets: [2], // Error Message column
-                    render: function(data, type, row) {
-                        if (type === 'display' && data) {
-                            return `<div class="error-message-multiline">${escapeHtml(data)}</div>`;
-                        }
-                        return data || '';
-                    }
+                    render: renderPreview('error-message-multiline')
                 },
                 {
                     targets: [3], // URL column
@@ -272,75 +456,19 @@ $(document).ready(function() {
             pageLength: 25,
             lengthMenu: [[10, 25, 50, 100], [10, 25, 50, 100]],
             order: [[4, 'desc']],
-            ajax: function(data, callback) {
-                const page = Math.floor(data.start / data.length) + 1;
-                const perPage = data.length;
-
-                const formData = new FormData($('#filterForm')[0]);
-                const params = new URLSearchParams(formData);
-                params.delete('time_from');
-                params.delete('time_to');
-                params.set('page', page);
-                params.set('per_page', perPage);
-
-                showLoading(true);
-                hideError();
-
-                $.ajax({
-                    url: '/api/logs-summary?' + params.toString(),
-                    method: 'GET',
-                    success: function(response) {
-                        const rows = (response.data || []).map(function(log) {
-                            return [
-                                log.practiceids || '',
-                                log.stacktraces || '',
-                                log.ErrorMassage || '',
-                                log.LLMSolution || '',
-                                log.ErrorCount || 0
-                            ];
-                        });
-
-                        updateRecordCount(response.total || rows.length);
-                        showLoading(false);
-
-                        callback({
-                            draw: data.draw,
-                            recordsTotal: response.total || rows.length,
-                            recordsFiltered: response.total || rows.length,
-                            data: rows
-                        });
-                    },
-                    error: function(xhr) {
-                        showLoading(false);
-                        let errorMessage = 'Failed to load summary data';
-                        if (xhr.responseJSON && xhr.responseJSON.error) {
-                            errorMessage += ': ' + xhr.responseJSON.error;
-                        }
-                        showError(errorMessage);
-                        callback({ draw: data.draw, recordsTotal: 0, recordsFiltered: 0, data: [] });
-                    }
-                });
-            },
+            ajax: summaryPipeline.ajax,
             columnDefs: [
                 {
                     targets: [1],
-                    render: function(data, type) {
-                        if (type === 'display' && data) {
-                            return `<div class="stacktrace-multiline" title="Click to view full stack trace"
-                                    style="cursor: pointer;"
-                                    onclick="showStackTrace('${escapeHtml(data)}')">${escapeHtml(data)}</div>`;
-                        }
-                        return data || '';
-                    }
+                    render: renderPreview('stacktrace-multiline', 'Click to view full stack trace')
+                },
+                {
+                    targets: [2],
+                    render: renderPreview('error-message-multiline')
                 },
                 {
                     targets: [3],
-                    render: function(data, type) {
-                        if (type === 'display' && data) {
-                            return `<div class="error-message-multiline">${escapeHtml(data)}</div>`;
-                        }
-                        return data || '';
-                    }
+                    render: renderPreview('error-message-multiline')
                 }
             ],
             language: {
@@ -353,6 +481,7 @@ $(document).ready(function() {
         // Filter form submission
         $('#filterForm').on('submit', function(e) {
             e.preventDefault();
+            logsPipeline.clear();
             logsTable.ajax.reload();
         });
         
@@ -363,6 +492,7 @@ $(document).ready(function() {
             setDefaultDates();
             // Reset the searchable dropdown
             resetPracticeIdDropdown();
+            logsPipeline.clear();
             logsTable.ajax.reload();
         });
         
@@ -389,6 +519,16 @@ $(document).ready(function() {
             const recordId = $(this).data('id');
             window.deleteRecord(recordId);
         });
+
+        // Stack trace cells only render a preview; open the full text from the row data
+        $('#logsTable tbody').on('click', '.stacktrace-multiline', function() {
+            window.showStackTrace(cellValue(logsTable, this, 5));
+        });
+
+        $('#summaryTable tbody').on('click', '.stacktrace-multiline', function() {
+            window.showStackTrace(cellValue(summaryTable, this, 1));
+        });
+
         // Toggle between Console and Common logs
         $('#logType').on('change', function() {
             const selected = $(this).val();
@@ -495,6 +635,10 @@ $(document).ready(function() {
         }
     }
     
+    function isSuperseded(xhr) {
+        return xhr.status === 409 && xhr.responseJSON && xhr.responseJSON.superseded;
+    }
+
     function showError(message) {
         $('#errorMessage').text(message);
         $('#errorAlert').removeClass('d-none');
@@ -570,6 +714,14 @@ $(document).ready(function() {
             $('#editLLMSolution').val(recordData[6]);        // LLMSolution
             $('#editJiraStatus').val(recordData[7]);         // Jira Status
             $('#editInsertedAt').val(recordData[8]);         // Inserted At
+            $('#editStatus').val('');
+            $('#editApplyToAll').prop('checked', false);
+
+            // Remember the loaded values so only edited fields are sent
+            $('#editRecordForm').data('original', {
+                LLMSolution: recordData[6],
+                JiraStatus: recordData[7]
+            });
 
             // Show the modal
             $('#editRecordModal').modal('show');
@@ -587,22 +739,58 @@ $(document).ready(function() {
         }
     };
 
-    // Save record function
+    // Save record function - updates this record or every occurrence of the same error
     window.saveRecord = function() {
-        const formData = {
-            id: $('#editRecordId').val(),
-            practiceid: $('#editPracticeId').val(),
-            errormessage: $('#editErrorMessage').val(),
-            url: $('#editUrl').val(),
-            errortime: $('#editErrorTime').val(),
-            stacktrace: $('#editStackTrace').val(),
-            jirastatus: $('#editJiraStatus').val()
-        };
+        const recordId = $('#editRecordId').val();
+        const original = $('#editRecordForm').data('original') || {};
+        const changes = {};
+
+        if ($('#editStatus').val().trim()) {
+            changes.Status = $('#editStatus').val().trim();
+        }
+        if ($('#editJiraStatus').val() !== (original.JiraStatus || '')) {
+            changes.JiraStatus = $('#editJiraStatus').val();
+        }
+        if ($('#editLLMSolution').val() !== (original.LLMSolution || '')) {
+            changes.LLMSolution = $('#editLLMSolution').val();
+        }
 
-        // Here you would typically make an AJAX call to save the record
-        // For now, just show a message and close the modal
-        alert('Save functionality would be implemented here for record ID: ' + formData.id);
-        $('#editRecordModal').modal('hide');
+        if ($.isEmptyObject(changes)) {
+            $('#editRecordModal').modal('hide');
+            return;
+        }
+
+        const applyToAll = $('#editApplyToAll').is(':checked');
+        if (applyToAll && !confirm('Apply these changes to every occurrence of this error? This can update a large number of records.')) {
+            return;
+        }
+
+        const match = applyToAll ? { like_id: recordId } : { id: recordId };
+        const saveButton = $('#saveRecordBtn').prop('disabled', true);
+
+        $.ajax({
+            url: '/api/logs/triage',
+            method: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify({ match: match, set: changes }),
+            success: function(response) {
+                $('#editRecordModal').modal('hide');
+                alert(`Updated ${response.affected} record${response.affected === 1 ? '' : 's'}`);
+                logsPipeline.clear();
+                summaryPipeline.clear();
+                logsTable.ajax.reload(null, false);
+            },
+            error: function(xhr) {
+                let errorMessage = 'Failed to save record';
+                if (xhr.responseJSON && xhr.responseJSON.message) {
+                    errorMessage += ': ' + xhr.responseJSON.message;
+                }
+                alert(errorMessage);
+            },
+            complete: function() {
+                saveButton.prop('disabled', false);
+            }
+        });
     };
 
     // Open Jira function